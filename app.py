@@ -1,8 +1,27 @@
-from flask import Flask, render_template, request, redirect
-from recommender.core import MakeupRecommender
+import os
+import hashlib
+import hmac
+import time
+
+from flask import Flask, render_template, request, redirect, jsonify, abort
+from recommender.core import MakeupRecommender, FACET_LATTICE_PATH, SNAPSHOT_PATH, REC_TABLE_PATH
 from recommender.core import STYLE_TAG_MAPPER, BROAD_MOOD_MAPPER, CONSTRAINT_MAPPER
+from recommender.tip_cache import TipCache, TIP_CACHE_PATH, TIP_STORE_PATH
+from recommender.style_tip import MOOD_DISPLAY, TONE_MAP, FACE_MAP
+from recommender.style_tip import make_llm_client, style_tip_cache_key, call_llm_style_tip, fallback_style_tip
+from recommender.style_jobs import StyleTipJobs
+from recommender.llm_executor import LLMExecutor, LLM_MAX_IN_FLIGHT, LLM_CALL_TIMEOUT_SEC
+from recommender.metrics import StageMetrics, SLOW_REQUEST_MS, STAGE_BUCKETS_MS
 
 app = Flask(__name__)
+app.json.ensure_ascii = False  # JSON 응답에 한글 그대로 (\uXXXX 이스케이프보다 작음)
+
+# 단계별 소요 시간 (엔진 + 뷰) -> /metrics, Server-Timing 헤더, 느린 요청 로그
+# STAGE_METRICS=0 이면 끔 (span 이 아무것도 안 함)
+stage_metrics = StageMetrics(
+    enabled=os.getenv("STAGE_METRICS", "1") != "0",
+    slow_ms=float(os.getenv("SLOW_REQUEST_MS", SLOW_REQUEST_MS))
+)
 
 # CSV 테스트모드
 # ====================================
@@ -10,19 +29,66 @@ app = Flask(__name__)
 # ====================================
 engine = MakeupRecommender(
     use_csv_for_test=True,
-    csv_path=r"C:\2025_2\최종_전처리완료_정리3.csv"
+    csv_path=r"C:\2025_2\최종_전처리완료_정리3.csv",
+    facet_path=os.getenv("FACET_LATTICE_PATH", FACET_LATTICE_PATH),  # build_facets.py 로 생성
+    rec_table_path=os.getenv("REC_TABLE_PATH", REC_TABLE_PATH),  # build_rec_table.py 로 생성 (없으면 실시간 계산)
+    snapshot_path=os.getenv("CATALOG_SNAPSHOT_PATH", SNAPSHOT_PATH),  # 전처리 결과 (없거나 오래되면 자동 재생성)
+    # 1 = 스냅샷을 mmap 으로 붙여서 사용 -> gunicorn 등 워커 여러 개가 카탈로그 메모리를 공유
+    #     (스냅샷은 첫 워커만 만들고 나머지는 기다렸다가 붙음 / --preload 로 마스터에서 한 번만 로드해도 됨)
+    shared_catalog=os.getenv("CATALOG_SHARED") == "1",
+    # 원본 전처리 프로세스 수 (기본 1). 2 이상은 gunicorn 등으로 띄울 때만
+    #     (python app.py 로 직접 실행하면 자식 프로세스가 이 모듈을 다시 실행함)
+    ingest_workers=int(os.getenv("CATALOG_INGEST_WORKERS", "1")),
+    metrics=stage_metrics
+)
 
+# 원본(CSV/DB)이 바뀌었는지 주기적으로 확인해서 서비스 중에 카탈로그 교체 (0/미설정 = 끔)
+if int(os.getenv("CATALOG_RELOAD_SEC", "0")) > 0:
+    engine.start_auto_reload(int(os.getenv("CATALOG_RELOAD_SEC")))
 
+client = make_llm_client()  # STYLE_TIP_STUB=1 이면 로컬 스텁
+
+# LLM 호출은 전부 이 실행기를 거침 (동시 호출 제한 / 마감 시간 / 서킷 차단)
+llm_executor = LLMExecutor(
+    max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", LLM_MAX_IN_FLIGHT)),
+    call_timeout_sec=float(os.getenv("LLM_CALL_TIMEOUT_SEC", LLM_CALL_TIMEOUT_SEC))
 )
 
-from openai import OpenAI
-import os
+# ====================================
+# 스타일 팁 캐시 (SQLite, 워커 간 공유)
+# - tip_store: pregen_tips.py 가 미리 만든 팁 (만료 없음, 먼저 확인)
+# - tip_cache: 실시간으로 만든 팁 (TTL/개수 제한)
+# ====================================
+tip_store = TipCache(os.getenv("STYLE_TIP_STORE_PATH", TIP_STORE_PATH), ttl_sec=None, max_entries=None)
+tip_cache = TipCache(os.getenv("STYLE_TIP_CACHE_PATH", TIP_CACHE_PATH))
+style_jobs = StyleTipJobs(llm_executor)  # /result 렌더링 후 따로 받아가는 팁 생성 작업 (실행기 제한 그대로 적용)
+STYLE_TIP_RETRY_SEC = 1   # pending 응답의 Retry-After (페이지가 이 간격으로 다시 조회)
+
+
+# ====================================
+# 요청 단위 시간 측정 (Server-Timing 헤더 + 느린 요청 로그)
+# ====================================
+SLOW_LOG_SKIP_PARAMS = {"nickname"}   # 느린 요청 로그에 남기지 않을 입력
+
+
+@app.before_request
+def begin_stage_timing():
+    if request.endpoint != "static":
+        stage_metrics.begin(request.endpoint or "unknown")
+
+
+@app.after_request
+def end_stage_timing(resp):
+    params = {k: v for k, v in request.values.items() if k not in SLOW_LOG_SKIP_PARAMS}
+    trace = stage_metrics.end(params)
+    if trace is not None:
+        resp.headers["Server-Timing"] = trace.server_timing()
+    return resp
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다!")
 
-client = OpenAI(api_key=api_key)
+@app.teardown_request
+def drop_stage_timing(exc):
+    stage_metrics.end()   # 예외로 after_request 를 건너뛴 경우 정리 (이미 끝났으면 아무것도 안 함)
 
 # ==========================================
 # 0. Start Page
@@ -133,30 +199,21 @@ def constraints():
     constraints_raw = request.form.get("constraints", "")
     selected_constraints = [t.strip() for t in constraints_raw.split(',') if t.strip()]
 
-    # 5. [수정됨] available_tags 호출 (인자 5개 모두 전달!)
-    available_tags = engine.get_available_tags(
-        user_occasion_group=user_occasion,    # 대분류도 주고
-        user_mood_group=user_mood,            # 대분류도 주고
-        style_tag=style_tag,
-        user_tone=tone,                       # 톤 정보도 주고
-        selected_pre_tags=selected_tags_list  # ⭐ [핵심] 세부 태그 리스트도 줌
-    )
-
-    # 6. [수정됨] compatible 호출 (인자 6개 모두 전달!)
-    compatible = engine.get_compatible_tags(
+    # 5. available / compatible / 버튼별 영상 수를 한 번에 계산 (후보군 필터링은 한 번만)
+    facets = engine.get_constraint_facets(
         selected_constraints,
-        user_occasion_group=occasion,         # 대분류
-        user_mood_group=moods,                # 대분류
+        user_occasion_group=user_occasion,    # 대분류
+        user_mood_group=user_mood,            # 대분류
         style_tag=style_tag,
         user_tone=tone,                       # 톤
         selected_pre_tags=selected_tags_list  # ⭐ [핵심] 세부 태그 리스트
     )
 
-    # compatible = [] 인 경우 → 모든 버튼 disabled
-    if compatible == []:
-        final_available = []
-    else:
-        final_available = list((set(available_tags) & set(compatible)) | set(selected_constraints))
+    # compatible = [] 인 경우 → 모든 버튼 disabled (엔진에서 처리)
+    final_available = facets["enabled"]
+
+    # 6. 버튼 옆에 보여줄 영상 수 (선택된 제약조건 + 해당 태그를 모두 만족하는 영상 수)
+    tag_counts = facets["counts_after"]
 
     return render_template(
         "constraints.html",
@@ -168,120 +225,105 @@ def constraints():
         style_tag=style_tag,
         selected_constraints=selected_constraints,
         available_tags=final_available,
+        tag_counts=tag_counts,
         face_shape=face_shape,
         nickname=request.form.get("nickname", "")
     )
 
-def generate_llm_style_tip(
-    user_face_shape,
-    user_tone,
-    user_tpo,
-    user_mood,
-    video_title,
-    video_keywords
-):
-    system_instruction = """
-당신은 청담동에서 10년 이상 활동한 ‘퍼스널 메이크업 전문 컨설턴트’입니다.
-당신의 임무는 사용자의 [얼굴형, 퍼스널컬러, 상황, 분위기] 정보를 바탕으로,
-추천된 메이크업 영상의 기법을 ‘사용자에게 맞게 변형’하여 실전 조언을 해주는 것입니다.
-
-[말하기 규칙]
-1. 20대 여성 친구에게 말하듯 다정하고 신뢰감 있는 말투(“~해요”, “~네요”)를 사용하세요.
-2. 영상 내용을 단순 요약하지 말고, 반드시 ‘사용자의 얼굴형·톤’과 연결해 조언하세요.
-
-────────────────────────
-[얼굴형 고정 멘트 – 수정 금지]
-
-땅콩형
-광대뼈가 매력적으로 도드라지고 턱선이 날렵한 얼굴형입니다. 얼굴의 굴곡을 부드럽게 연결해 세련된 인상을 줄 수 있어요.
-쉐딩: 옆 광대의 돌출된 부분과 턱 끝 라인을 감싸 전체적인 얼굴 라인을 매끄럽게 연결
-하이라이터: 눈 밑 앞볼 부위(삼각형 존)와 턱 끝에 사용하여 시선을 얼굴 중앙으로 모아줌
-블러셔: 광대 감싸듯 연결
-
-긴형
-성숙하고 우아한 이미지를 가진 얼굴형입니다. 시선을 가로로 확장시켜 생기와 볼륨을 더해주는 방식이 잘 어울려요.
-쉐딩: 턱 끝 아래
-하이라이터: 눈 밑을 터치하여 얼굴의 중안부를 환하게 밝혀줌 
-블러셔: 가로 방향(수평)으로 넓게 펴 발라주어 여백을 채워줌
-
-각진형
-하관과 턱선이 뚜렷해 고급스럽고 모던한 분위기를 주는 얼굴형입니다. 직선적인 느낌을 중화시키면 부드러운 인상이 살아나요.
-쉐딩: 턱 양 끝, 헤어라인 옆쪽 등 윤곽이 뚜렷한 부위에 음영을 줌
-하이라이터: 콧대, 턱 중앙 등 얼굴 안쪽에 포인트를 주어 입체감을 살림 
-블러셔: 사선 또는 앞볼에 동그랗게 연출
-
-계란형(oval)
-전체적인 비율이 균형 잡혀 있어 다양한 스타일을 소화하기 좋은 얼굴형입니다. 인위적인 터치보다는 윤곽을 자연스럽게 살리는 게 좋아요.
-쉐딩: 외곽 정돈
-하이라이터: 콧대, 턱 끝, C존(광대)
-블러셔: 광대 따라 자연스럽게
-
-둥근형
-부드러운 곡선 덕분에 어려 보이고 친근한 인상을 주는 얼굴형입니다. 윤곽을 또렷하게 잡아주면 훨씬 세련된 분위기가 살아나요.
-쉐딩: 얼굴 양옆 외곽~턱선
-하이라이터: 이마, 콧대, 턱 세로 강조
-블러셔: 사선 방향으로 연출하여 둥근 볼의 매력은 살리면서도 시원한 느낌을 줌 
-
-하트형(heart)
-이마가 시원하고 턱선이 갸름해 러블리한 느낌을 주는 얼굴형입니다. 상안부와 하안부의 밸런스를 맞추는 메이크업이 잘 어울려요.
-쉐딩: 관자, 턱 끝
-하이라이터: 이마 중앙, 턱 중앙, 눈 밑
-블러셔: 볼 중앙 위주로 발라주면 갸름한 턱선과 대비되어 화사한 느낌을 줌 
-
-────────────────────────
-
-[출력 형식 – 반드시 이 형식으로만 출력할 것]
-
-문단 합치기, 한 줄 출력, 자유 서술은 허용하지 않습니다.
-
-[얼굴형]
-(얼굴형 고정 멘트 그대로)
-
-[쉐딩]
-(쉐딩 조언 1문장)
-
-[하이라이터]
-(하이라이터 조언 1문장)
-
-[블러셔]
-(블러셔 조언 1문장)
-
-[색조 포인트]
-(퍼스널컬러 기준 + Top-N 영상 스타일을 모두 조합한 색조 조언 3문장)
-
-**주의:** 각 항목은 반드시 줄을 바꿔서 한 항목당 한 줄로 출력해야 하며,  
-각 항목 앞에는 반드시 '\n' 줄바꿈 문자를 포함하여 출력하세요.
-"""
-
-    user_input_data = f"""
-[사용자 프로필]
-- 얼굴형: {user_face_shape} (예: 둥근형, 긴형, 각진형...)
-- 퍼스널컬러: {user_tone} (예: 봄웜, 여쿨, 겨울쿨...)
-
-[원한 상황]
-- TPO: {user_tpo} (예: 데이트, 출근...)
-- 분위기: {user_mood} (예: 러블리, 시크...)
-
-[추천 영상]
-- 제목: {video_title}
-- 키워드: {video_keywords}
-"""
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            temperature=0.7,
-            messages=[
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": user_input_data}
-            ]
+# ==========================================
+# 5-0. 카탈로그 상태 (버전 / 마지막 리로드 소요 시간)
+# ==========================================
+@app.route("/api/catalog")
+def api_catalog():
+    resp = jsonify(engine.reload_stats())
+    resp.cache_control.no_store = True
+    return resp
+
+
+# ==========================================
+# 5-0-1. 단계별 소요 시간 (METRICS_TOKEN 을 설정했을 때만, 토큰으로 조회)
+#   /metrics             : Prometheus 텍스트 (단계별 히스토그램)
+#   /metrics?format=json : 히스토그램 + 최근 느린 요청 (입력 / fallback 경로 포함)
+#   요청 헤더: Authorization: Bearer <METRICS_TOKEN>
+#   (리버스 프록시 뒤에서는 remote_addr 가 항상 127.0.0.1 이라 주소로는 막을 수 없음)
+# ==========================================
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+@app.route("/metrics")
+def metrics():
+    sent = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not METRICS_TOKEN or not hmac.compare_digest(sent.encode("utf-8"), METRICS_TOKEN.encode("utf-8")):
+        abort(404)
+
+    if request.args.get("format") == "json":
+        resp = jsonify(
+            enabled=stage_metrics.enabled,
+            buckets_ms=list(STAGE_BUCKETS_MS),
+            stages=stage_metrics.snapshot(),
+            slow_requests=list(stage_metrics.slow_requests)
         )
+    else:
+        resp = app.response_class(stage_metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+    resp.cache_control.no_store = True
+    return resp
 
-        return response.choices[0].message.content.strip()
 
-    except Exception as e:
-        print("LLM ERROR:", e)
-        return f"오늘 같은 {user_tpo} 날에는 {user_mood} 분위기가 딱이에요! {user_tone} 톤에 맞춰 립 컬러만 살짝 조절해 보세요."
+# ==========================================
+# 5-1. 제약조건 버튼 상태 JSON (페이지 새로고침 없이 갱신)
+# ==========================================
+@app.route("/api/facets")
+def api_facets():
+    moods_raw = request.args.get("moods", "")
+    moods = moods_raw if moods_raw not in ["", "[]", None] else None
+    tags_raw = request.args.get("tags", "")
+    constraints_raw = request.args.get("constraints", "")
+    # 계산 전에 읽어 둠 -> 도중에 카탈로그가 바뀌면 예전 ETag 로 나가서 다음 요청에 다시 계산
+    fingerprint = engine.catalog_fingerprint
+
+    facets = engine.get_constraint_facets(
+        [t.strip() for t in constraints_raw.split(",") if t.strip()],
+        user_occasion_group=request.args.get("occasion"),
+        user_mood_group=moods,
+        style_tag=request.args.get("style_tag"),
+        user_tone=request.args.get("tone"),
+        selected_pre_tags=[t for t in tags_raw.split(",") if t]
+    )
+
+    resp = jsonify(
+        enabled=sorted(facets["enabled"]),
+        counts=facets["counts_after"],
+        total=facets["total_after"]
+    )
+
+    # 카탈로그가 없거나 로드 실패 -> 캐시하지 않음
+    if fingerprint is None:
+        resp.cache_control.no_store = True
+        return resp
+
+    # 같은 카탈로그 + 같은 쿼리면 결과도 같음 -> 캐시는 허용하되 매번 ETag 로 확인 (리로드 후 바로 새 개수)
+    resp.cache_control.public = True
+    resp.cache_control.no_cache = True
+    resp.set_etag(hashlib.sha1(fingerprint.encode() + b"|" + request.query_string).hexdigest())
+    return resp.make_conditional(request)
+
+
+def lookup_style_tip(cache_key):
+    # 배치로 미리 만든 팁 -> 실시간 캐시 순서로 확인
+    tip = tip_store.get(cache_key)
+    if tip is None:
+        tip = tip_cache.get(cache_key)
+    return tip
+
+
+def save_style_tip(cache_key):
+    # 팁 생성 작업이 성공했을 때만 호출 (실패 시 대체 문구는 저장하지 않음)
+    started = time.perf_counter()
+
+    def save(style_tip):
+        stage_metrics.observe("llm.style_tip", (time.perf_counter() - started) * 1000)
+        tip_cache.put(cache_key, style_tip)
+    return save
 
 # ==========================================
 # 6. 결과 페이지
@@ -295,14 +337,6 @@ def result():
     mood      = request.form.get("moods", "")
     style_tag = request.form.get("style_tag", "")
 
-    MOOD_DISPLAY = {
-        "group_natural": "내추럴 / 청순",
-        "group_lovely": "러블리",
-        "group_glam": "글램 / 고급",
-        "group_chic": "시크 / 스모키 / 고혹",
-        "group_hip": "힙·트렌디 / 유니크"
-    }
-
     # mood display name
     mood_display = MOOD_DISPLAY.get(mood, "")
 
@@ -312,19 +346,6 @@ def result():
     # ===============================
     # 1) Tone Key 매핑
     # ===============================
-    TONE_MAP = {
-        "봄웜": "spring",
-        "여쿨": "summer",
-        "가을웜": "autumn",
-        "겨쿨": "winter",
-
-        "웜톤": "spring",  # 퀴즈에서 선택한 경우
-        "쿨톤": "summer",
-
-        "뉴트럴": "neutral",
-        "neutral": "neutral"
-    }
-
     tone_key = TONE_MAP.get(tone, "neutral")
 
     # 🔥 ignore_tone이면 무조건 neutral
@@ -334,27 +355,7 @@ def result():
     # ===============================
     # 2) Face Shape Key 매핑
     # ===============================
-    face_map = {
-        "계란형": "oval",
-        "oval": "oval",
-
-        "둥근형": "round",
-        "round": "round",
-
-        "땅콩형": "diamond",
-        "diamond": "diamond",
-
-        "각진형": "square",
-        "square": "square",
-
-        "하트형": "heart",
-        "heart": "heart",
-
-        "긴형": "long",
-        "long": "long"
-    }
-
-    face_key = face_map.get(request.form.get("face_shape", ""), "oval")
+    face_key = FACE_MAP.get(request.form.get("face_shape", ""), "oval")
 
     # ===============================
     # 3) 최종 파일 이름 만들기
@@ -390,12 +391,15 @@ def result():
     results = recommendation_data["results"]
     flag_info = recommendation_data["flag_info"]
 
-    # ✅ LLM 스타일 카드 생성 (1등 영상 기준)
+    # ✅ LLM 스타일 카드 (1등 영상 기준)
+    # - 캐시에 있으면 바로 표시
+    # - 없으면 백그라운드 작업만 걸어두고 페이지 먼저 렌더링 -> /api/style-tip/<job_id> 로 받아감
     style_tip = ""
+    style_tip_job = ""
     if results:
         top_video = results[0]
 
-        style_tip = generate_llm_style_tip(
+        tip_args = dict(
             user_face_shape=request.form.get("face_shape"),
             user_tone=tone,
             user_tpo=occasion,
@@ -403,24 +407,61 @@ def result():
             video_title=top_video["title"],
             video_keywords=top_video.get("moods", "")
         )
+        cache_key = style_tip_cache_key(**tip_args)
+
+        with stage_metrics.span("view.style_tip_lookup"):
+            style_tip = lookup_style_tip(cache_key) or ""
+        if not style_tip:
+            # job id = 캐시 키 -> 같은 입력의 동시 요청은 작업 하나를 공유
+            # LLM 실행기가 꽉 찼거나 차단 중이면 작업 없이 바로 대체 문구
+            style_tip_job = style_jobs.submit(
+                cache_key, call_llm_style_tip, client,
+                fallback=fallback_style_tip(**tip_args), on_success=save_style_tip(cache_key), **tip_args
+            ) or ""
+            if not style_tip_job:
+                style_tip = fallback_style_tip(**tip_args)
+
+    with stage_metrics.span("view.render"):
+        return render_template(
+            "results.html",
+            results=results,
+            flag_info=flag_info,  # 🔥 [핵심] 템플릿에 알림 정보도 같이 던져줌!
+            tone=tone,
+            face_shape=request.form.get("face_shape", ""),
+            occasion=occasion,
+            moods=mood,
+            mood_display=mood_display,
+            tags=final_tags,
+            tab_mode=tab_mode,
+            contour_filename=contour_filename,
+            style_tag=request.form.get("style_tag"),
+            nickname=request.form.get("nickname", ""),
+            ignore_tone=ignore_tone_flag,
+            style_tip=style_tip,
+            style_tip_job=style_tip_job
+        )
 
-    return render_template(
-        "results.html",
-        results=results,
-        flag_info=flag_info,  # 🔥 [핵심] 템플릿에 알림 정보도 같이 던져줌!
-        tone=tone,
-        face_shape=request.form.get("face_shape", ""),
-        occasion=occasion,
-        moods=mood,
-        mood_display=mood_display,
-        tags=final_tags,
-        tab_mode=tab_mode,
-        contour_filename=contour_filename,
-        style_tag=request.form.get("style_tag"),
-        nickname=request.form.get("nickname", ""),
-        ignore_tone=ignore_tone_flag,
-        style_tip=style_tip
-    )
+
+# ==========================================
+# 6-1. 스타일 팁 받아가기 (짧은 조회 반복)
+# - 진행 중이면 최대 STYLE_JOB_POLL_SEC 만 기다리고 202 + Retry-After -> 페이지가 잠시 뒤 다시 조회
+# ==========================================
+@app.route("/api/style-tip/<job_id>")
+def api_style_tip(job_id):
+    status, tip = style_jobs.poll(job_id)
+
+    # 이 프로세스에 없는 작업 = 다른 워커 프로세스가 맡은 작업일 수 있음
+    # -> 공유 캐시에 있으면 done, 없으면 기다리지 않고 바로 pending (페이지 쪽 재시도 횟수는 제한됨)
+    if status == "unknown":
+        tip = lookup_style_tip(job_id)
+        status = "done" if tip is not None else "pending"
+
+    resp = jsonify(status=status, tip=tip or "")
+    resp.cache_control.no_store = True
+    if status == "pending":
+        resp.status_code = 202
+        resp.headers["Retry-After"] = str(STYLE_TIP_RETRY_SEC)
+    return resp
 
 if __name__ == "__main__":
     app.run(
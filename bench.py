@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource  # 최대 메모리 측정 (윈도우에는 없음 -> 기록 안 함)
+except ImportError:
+    resource = None
+
+from recommender.core import MakeupRecommender, OCCASION_TAGS, MOOD_GROUP_TAGS, STYLE_TAG_MAPPER, CONSTRAINT_TAGS
+from recommender.style_tip import TONE_MAP
+
+
+# ==========================================
+# 추천 엔진 벤치마크 (합성 카탈로그 1× / 10× / 100×)
+#   python bench.py --csv 최종_전처리완료_정리5.csv --scales 1 10 100 --out bench.json
+#   python bench.py --csv 최종_전처리완료_정리5.csv --compare bench_prev.json   (p95 가 느려지면 종료 코드 1)
+#
+# - 배율마다 새 프로세스에서 로드 + 측정 -> 최대 메모리가 배율별로 따로 잡힘
+# - 질의는 Track 1 (무드 우선) / Track 2 (스타 우선) 의 Fallback 분기별로 같은 수만큼 섞어서 재생
+# - 결과 캐시는 기본으로 끔 (엔진 자체 비용 측정), --cache 로 켤 수 있음
+# ==========================================
+BENCH_QUERY_POOL = 1500     # 분기 분류용 후보 질의 수
+BENCH_QUERIES = 2000        # 배율마다 재생할 질의 수
+BENCH_SEED = 42
+BENCH_OPS = ["recommend", "available", "compatible"]
+
+# 측정해야 하는 recommend 분기 (빠진 분기는 결과에 missing_branches 로 표시)
+BENCH_BRANCHES = [
+    "track1/tpo_only", "track1/mood_broad", "track1/mood_broad_dropped", "track1/mood_detail",
+    "track1/mood_detail_dropped", "track1/mood_all_dropped",
+    "track2/star_only", "track2/star_tpo", "track2/tpo_dropped",
+]
+
+TPO_DETAIL_TAGS = {t for tags in OCCASION_TAGS.values() for t in tags}
+MOOD_DETAIL_TAGS = {t for tags in MOOD_GROUP_TAGS.values() for t in tags}
+
+
+# -----------------------------
+# 🔥 (1) 합성 카탈로그
+# - 원본 행은 그대로 한 벌 (스타 지정 ID 등 실제 ID 유지) + 나머지는 원본 행을 뽑아서 변형
+# - 톤/상황/무드 라벨 조합은 원본 분포 그대로, 제목/키워드는 원본 어휘에서 빈도대로 섞음
+# -----------------------------
+def synthesize_catalog(source, scale, seed=BENCH_SEED):
+    rng = np.random.default_rng(seed + scale)
+    n_extra = int(len(source) * (scale - 1))
+    if n_extra <= 0:
+        return source.copy()
+
+    base = source.iloc[rng.integers(0, len(source), n_extra)].reset_index(drop=True)
+    extra = base.copy()
+
+    # 제목: 원본 제목 + 전체 제목 어휘에서 빈도대로 뽑은 단어 1~2개 (키워드 매칭 비율은 원본과 비슷하게 유지)
+    title_words = source['title'].fillna('').str.split().explode().dropna().to_numpy()
+    n_words = rng.integers(1, 3, n_extra)
+    picked = rng.choice(title_words, n_words.sum())
+    cuts = np.cumsum(n_words)[:-1]
+    extra['title'] = [f"{t} {' '.join(w)}" for t, w in zip(base['title'].fillna('').tolist(), np.split(picked, cuts))]
+
+    # 키워드: 30% 는 한 개를 전체 키워드 어휘에서 뽑은 것으로 교체
+    keywords = source['description_keywords'].fillna('').str.split(',').explode().str.strip()
+    keywords = keywords[keywords != ''].to_numpy()
+    swap = rng.random(n_extra) < 0.3
+    replacement = rng.choice(keywords, n_extra)
+    extra['description_keywords'] = [
+        ", ".join([r] + kw.split(",")[1:]) if s and kw else kw
+        for kw, s, r in zip(base['description_keywords'].fillna('').tolist(), swap, replacement)
+    ]
+
+    # 조회수 / 좋아요 / 업로드일: 원본 값 주변으로 흔들기
+    noise = rng.lognormal(0.0, 0.5, n_extra)
+    extra['views'] = (base['views'].fillna(0).to_numpy() * noise).astype(np.int64)
+    extra['likes'] = (base['likes'].fillna(0).to_numpy() * noise).astype(np.int64)
+    published = pd.to_datetime(base['published_at'], errors='coerce', format='mixed')
+    shifted = published + pd.to_timedelta(rng.integers(-180, 181, n_extra), unit='D')
+    extra['published_at'] = shifted.dt.strftime('%Y-%m-%d').where(published.notna(), base['published_at'])
+
+    extra['video_id'] = [f"syn{scale}x{i:08d}" for i in range(n_extra)]
+    extra['url'] = "https://www.youtube.com/watch?v=" + extra['video_id']
+    if 'id' in extra.columns:
+        extra['id'] = np.arange(n_extra) + int(source['id'].max()) + 1
+
+    return pd.concat([source, extra], ignore_index=True)
+
+
+# -----------------------------
+# 🔥 (2) 질의 생성 + Fallback 분기 분류
+# -----------------------------
+def make_query_pool(n, seed=BENCH_SEED):
+    # app.py 의 화면 흐름과 같은 입력 (A탭 = 무드, B탭 = 워너비 스타)
+    rng = random.Random(seed)
+    tones = list(TONE_MAP) + [""]
+    stars = list(STYLE_TAG_MAPPER)
+    pool = []
+    for _ in range(n):
+        occasion = rng.choice(list(OCCASION_TAGS) + [""])
+        tags = []
+        if OCCASION_TAGS.get(occasion) and rng.random() < 0.5:
+            tags.append(rng.choice(OCCASION_TAGS[occasion]))
+
+        if rng.random() < 0.35:
+            style_tag, mood = rng.choice(stars), None
+            tags.append(style_tag)
+        else:
+            style_tag, mood = None, rng.choice(list(MOOD_GROUP_TAGS) + [None])
+            if mood and rng.random() < 0.6:
+                tags.append(rng.choice(MOOD_GROUP_TAGS[mood]))
+
+        pool.append({
+            "tone": rng.choice(tones),
+            "occasion": occasion,
+            "mood": mood,
+            "style_tag": style_tag,
+            "tags": tags,
+            "constraints": rng.sample(CONSTRAINT_TAGS, rng.choice([0, 0, 1, 1, 2, 3])),
+            "ignore_tone": rng.random() < 0.2,
+        })
+    return pool
+
+
+def run_op(engine, op, q):
+    if op == "recommend":
+        return engine.recommend(
+            user_tone=q["tone"],
+            user_occasion_group=q["occasion"],
+            user_mood_group=q["mood"] or [],
+            selected_tags=q["tags"] + q["constraints"],
+            ignore_tone=q["ignore_tone"],
+            top_k=5
+        )
+    if op == "available":
+        return engine.get_available_tags(q["occasion"], q["mood"], q["style_tag"], q["tone"], q["tags"])
+    return engine.get_compatible_tags(q["constraints"], q["occasion"], q["mood"], q["style_tag"], q["tone"], q["tags"])
+
+
+def classify_branch(q, flag_info):
+    # recommend 의 어느 분기로 끝났는지 (flag_info.status + 입력 모양)
+    status = flag_info["status"]
+    if q["style_tag"]:
+        if status != "success":
+            return "track2/" + status
+        has_tpo = bool(q["occasion"]) or any(t in TPO_DETAIL_TAGS for t in q["tags"])
+        return "track2/star_tpo" if has_tpo else "track2/star_only"
+
+    if status != "success":
+        return "track1/" + status
+    if any(t in MOOD_DETAIL_TAGS for t in q["tags"]):
+        return "track1/mood_detail"
+    return "track1/mood_broad" if q["mood"] else "track1/tpo_only"
+
+
+def build_query_mix(engine, pool, n, seed=BENCH_SEED):
+    # 분기별로 나눠서 같은 수만큼 뽑음 -> 드문 Fallback 분기도 충분히 측정 (이 과정이 워밍업도 겸함)
+    by_branch = {}
+    for q in pool:
+        branch = classify_branch(q, run_op(engine, "recommend", q)["flag_info"])
+        by_branch.setdefault(branch, []).append(q)
+
+    rng = random.Random(seed)
+    per_branch = max(1, n // max(1, len(by_branch)))
+    mix = [(branch, rng.choice(qs)) for branch, qs in by_branch.items() for _ in range(per_branch)]
+    rng.shuffle(mix)
+    return mix, {branch: len(qs) for branch, qs in sorted(by_branch.items())}
+
+
+# -----------------------------
+# 🔥 (3) 측정
+# -----------------------------
+def summarize(latencies_ms):
+    if not latencies_ms:
+        return {"count": 0}
+    arr = np.asarray(latencies_ms)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"count": len(arr), "mean_ms": round(float(arr.mean()), 3), "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3), "max_ms": round(float(arr.max()), 3)}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)   # macOS 는 bytes, 리눅스는 KB
+
+
+def prepare_catalog(source_csv, scale, workdir, seed):
+    csv_path = os.path.join(workdir, f"bench_catalog_{scale}x_seed{seed}.csv")
+    if not os.path.exists(csv_path):
+        synthesize_catalog(pd.read_csv(source_csv), scale, seed).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def bench_scale(csv_path, scale, n_queries, pool_size, threads, use_cache, seed):
+    # 새 프로세스에서 실행됨 (배율별 메모리 분리)
+    started = time.perf_counter()
+    engine = MakeupRecommender(use_csv_for_test=True, csv_path=csv_path, recency_refresh_sec=None,
+                               cache_size=1024 if use_cache else 0)
+    load_sec = time.perf_counter() - started
+    rss_after_load = peak_rss_mb()
+
+    mix, pool_branches = build_query_mix(engine, make_query_pool(pool_size, seed), n_queries, seed)
+
+    def replay(item):
+        branch, q = item
+        timings = {}
+        for op in BENCH_OPS:
+            t0 = time.perf_counter_ns()
+            run_op(engine, op, q)
+            timings[op] = (time.perf_counter_ns() - t0) / 1e6
+        return branch, timings
+
+    started = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            measured = list(pool.map(replay, mix))
+    else:
+        measured = [replay(item) for item in mix]
+    wall_sec = time.perf_counter() - started
+
+    ops = {op: summarize([t[op] for _, t in measured]) for op in BENCH_OPS}
+    branches = {}
+    for branch in sorted(pool_branches):
+        branches[branch] = summarize([t["recommend"] for b, t in measured if b == branch])
+
+    return {
+        "scale": scale,
+        "videos": len(engine.df),
+        "load_sec": round(load_sec, 3),
+        "bytes_per_video": engine.catalog_memory()["bytes_per_video"],
+        "rss_after_load_mb": rss_after_load,
+        "peak_rss_mb": peak_rss_mb(),
+        "queries": len(mix),
+        "threads": threads,
+        "throughput_qps": round(len(mix) / wall_sec, 1) if wall_sec else None,
+        "ops_per_sec": round(len(mix) * len(BENCH_OPS) / wall_sec, 1) if wall_sec else None,
+        "ops": ops,
+        "branches": branches,
+        "pool_branches": pool_branches,
+        "missing_branches": [b for b in BENCH_BRANCHES if b not in pool_branches],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# -----------------------------
+# 🔥 (4) 이전 결과와 비교 (회귀 감지)
+# -----------------------------
+def compare_reports(current, previous, tolerance):
+    prev_by_scale = {r["scale"]: r for r in previous["results"]}
+    regressions = []
+    for result in current["results"]:
+        prev = prev_by_scale.get(result["scale"])
+        if prev is None:
+            continue
+        for op, stats in result["ops"].items():
+            old = prev["ops"].get(op, {}).get("p95_ms")
+            new = stats.get("p95_ms")
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{result['scale']}x {op} p95 {old}ms -> {new}ms (+{(new / old - 1):.0%})")
+    return regressions
+
+
+def print_report(result):
+    print(f"\n📊 {result['scale']}x  영상 {result['videos']}개 | 로드 {result['load_sec']}s | "
+          f"영상당 {result['bytes_per_video']} bytes | 최대 메모리 {result['peak_rss_mb']} MB | "
+          f"처리량 {result['throughput_qps']} 질의/초")
+    for op, s in result["ops"].items():
+        print(f"   {op:<11} p50 {s['p50_ms']:>8.2f}ms  p95 {s['p95_ms']:>8.2f}ms  p99 {s['p99_ms']:>8.2f}ms")
+    for branch, s in result["branches"].items():
+        if s["count"]:
+            print(f"   · {branch:<28} n={s['count']:<5} p50 {s['p50_ms']:>8.2f}ms  p95 {s['p95_ms']:>8.2f}ms")
+    if result["missing_branches"]:
+        print(f"   ⚠️ 질의 후보에 없는 분기: {', '.join(result['missing_branches'])} (--pool 을 늘려보세요)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 카탈로그로 추천 엔진 지연 시간 / 처리량 / 메모리를 측정합니다.")
+    parser.add_argument("--csv", required=True, help="원본 카탈로그 CSV (합성 카탈로그의 기준)")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100], help="카탈로그 배율")
+    parser.add_argument("--queries", type=int, default=BENCH_QUERIES, help="배율마다 재생할 질의 수")
+    parser.add_argument("--pool", type=int, default=BENCH_QUERY_POOL, help="분기 분류용 후보 질의 수")
+    parser.add_argument("--threads", type=int, default=1, help="동시에 질의를 보낼 스레드 수")
+    parser.add_argument("--cache", action="store_true", help="결과 캐시 켜고 측정")
+    parser.add_argument("--seed", type=int, default=BENCH_SEED)
+    parser.add_argument("--workdir", help="합성 CSV 보관 위치 (기본: 임시 디렉터리, 지정하면 다음 실행에서 재사용)")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 가 이 비율 이상 느려지면 회귀로 판단")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_")
+    os.makedirs(workdir, exist_ok=True)
+    scales = [int(s) if float(s).is_integer() else s for s in args.scales]
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "source_csv": os.path.basename(args.csv),
+            "seed": args.seed,
+            "queries": args.queries,
+            "threads": args.threads,
+            "cache": args.cache,
+        },
+        "results": [],
+    }
+
+    # 합성 / 측정 모두 배율마다 새 프로세스 (spawn) -> 다른 단계의 메모리가 측정에 섞이지 않음
+    ctx = multiprocessing.get_context("spawn")
+    for scale in scales:
+        print(f"⏳ {scale}x 카탈로그 준비 중...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            csv_path = pool.submit(prepare_catalog, args.csv, scale, workdir, args.seed).result()
+
+        print(f"⏳ {scale}x 측정 중...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            result = pool.submit(bench_scale, csv_path, scale, args.queries, args.pool,
+                                 args.threads, args.cache, args.seed).result()
+        report["results"].append(result)
+        print_report(result)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 결과 저장: {args.out}")
+    else:
+        print(json.dumps(report, ensure_ascii=False))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_reports(report, previous, args.tolerance)
+        if regressions:
+            print("❌ 성능 회귀:")
+            for line in regressions:
+                print(f"   {line}")
+            raise SystemExit(1)
+        print(f"✅ 이전 결과 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import argparse
+
+from recommender.core import MakeupRecommender, FACET_LATTICE_PATH, INGEST_WORKERS
+
+
+# ==========================================
+# 제약조건 버튼용 facet lattice 빌드
+#   python build_facets.py --csv 최종_전처리완료_정리5.csv
+#   (--csv 없이 실행하면 DB에서 로드)
+# ==========================================
+def main():
+    parser = argparse.ArgumentParser(description="UI에서 가능한 모든 선택 조합의 제약조건별 영상 수를 미리 계산합니다.")
+    parser.add_argument("--csv", help="카탈로그 CSV 경로 (없으면 DB)")
+    parser.add_argument("--out", default=FACET_LATTICE_PATH, help="저장할 파일 경로 (.npz)")
+    args = parser.parse_args()
+
+    engine = MakeupRecommender(use_csv_for_test=bool(args.csv), csv_path=args.csv, recency_refresh_sec=None,
+                               ingest_workers=INGEST_WORKERS)
+    if engine.df.empty:
+        raise SystemExit("❌ 카탈로그가 비어 있어서 lattice를 만들 수 없습니다.")
+
+    lattice = engine.build_facet_lattice()
+    lattice.save(args.out)
+    print(f"✅ facet lattice 저장 완료: {args.out} ({len(lattice.keys)}개 조합)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from recommender.core import MakeupRecommender, REC_TABLE_PATH, REC_TABLE_TOP_K, REC_TABLE_MAX_CONSTRAINTS
+from recommender.core import INGEST_WORKERS
+from recommender.style_tip import TONE_MAP
+
+
+# ==========================================
+# 추천 결과표 빌드 (UI에서 보낼 수 있는 입력 전부의 순위 + 알림 메시지)
+#   python build_rec_table.py --csv 최종_전처리완료_정리5.csv
+#   (--csv 없이 실행하면 DB에서 로드)
+#
+# - 날이 바뀌어 recency 점수가 달라지면 서버가 조합마다 저장해 둔 후보를 지금 점수로 다시 채점
+#   (결과가 실시간 계산과 같다고 확인될 때만 사용, 아니면 그 조합만 실시간 계산)
+# - 카탈로그 / 조회수가 바뀌거나 빌드 후 REC_TABLE_MAX_AGE_DAYS(기본 7일)가 지나면 다시 빌드
+#   (그 전까지는 서버가 알아서 실시간 계산으로 대체)
+# ==========================================
+def main():
+    parser = argparse.ArgumentParser(description="UI에서 가능한 모든 입력 조합의 추천 결과를 미리 계산합니다.")
+    parser.add_argument("--csv", help="카탈로그 CSV 경로 (없으면 DB)")
+    parser.add_argument("--out", default=REC_TABLE_PATH, help="저장할 디렉터리 경로")
+    parser.add_argument("--top-k", type=int, default=REC_TABLE_TOP_K, help="조합당 저장할 결과 수")
+    parser.add_argument("--max-constraints", type=int, default=REC_TABLE_MAX_CONSTRAINTS,
+                        help="미리 계산할 제약조건 최대 선택 개수 (그 이상은 실시간 계산)")
+    args = parser.parse_args()
+
+    engine = MakeupRecommender(use_csv_for_test=bool(args.csv), csv_path=args.csv, recency_refresh_sec=None,
+                               ingest_workers=INGEST_WORKERS)
+    if engine.df.empty:
+        raise SystemExit("❌ 카탈로그가 비어 있어서 추천 결과표를 만들 수 없습니다.")
+
+    started = time.perf_counter()
+    table = engine.build_rec_table(list(TONE_MAP), top_k=args.top_k, max_constraints=args.max_constraints)
+    table.save(args.out)
+    print(f"✅ 추천 결과표 저장 완료: {args.out} ({len(table)}개 조합, {time.perf_counter() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
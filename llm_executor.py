@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeout
+
+# ==========================================
+# LLM 호출 전용 실행기
+# - 동시 요청 수 제한 + 대기열 제한 (넘치면 바로 거절 -> 대체 문구)
+# - 호출마다 마감 시간
+# - 같은 키의 동시 요청은 업스트림 호출 하나를 공유 (single-flight)
+# - 실패/지연 비율이 높으면 서킷 차단 -> 한동안 바로 대체 문구
+# ==========================================
+LLM_MAX_IN_FLIGHT = 8
+LLM_MAX_QUEUE = 16
+LLM_CALL_TIMEOUT_SEC = 20.0
+
+BREAKER_WINDOW = 20            # 최근 몇 번의 결과로 판단할지
+BREAKER_MIN_CALLS = 5          # 이 이상 쌓여야 차단 판단
+BREAKER_FAILURE_RATIO = 0.5    # 실패(지연 포함) 비율이 이 이상이면 차단
+BREAKER_SLOW_CALL_SEC = 10.0   # 이보다 느리면 성공해도 실패로 셈
+BREAKER_COOLDOWN_SEC = 30.0    # 차단 후 다시 시도해보기까지 시간
+
+
+class LLMUnavailable(Exception):
+    # 서킷 차단 / 대기열 초과 / 마감 초과 -> 호출 쪽은 대체 문구 사용
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                 failure_ratio=BREAKER_FAILURE_RATIO, cooldown_sec=BREAKER_COOLDOWN_SEC):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.cooldown_sec = cooldown_sec
+
+        self._outcomes = deque(maxlen=window)   # True = 실패
+        self._opened_at = None                  # None = 닫힘(정상)
+        self._trial_running = False             # half-open 시험 호출 진행 중
+        self._generation = 0                    # 차단될 때마다 증가 -> 그 전에 시작된 호출 결과는 무시
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self.cooldown_sec:
+            return "open"
+        return "half_open"
+
+    # 호출해도 되면 티켓 (세대, 시험 호출 여부), 안 되면 None -> 결과는 record(티켓, ...) 로 돌려줌
+    def allow(self):
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return (self._generation, False)
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True   # 시험 호출은 한 번에 하나만
+                return (self._generation, True)
+            return None
+
+    def record(self, ticket, failed):
+        generation, trial = ticket
+        with self._lock:
+            now = time.monotonic()
+
+            if trial:
+                # half-open 시험 결과만 상태를 바꿈 -> 성공이면 닫고 새로 시작, 실패면 다시 차단
+                if generation != self._generation or not self._trial_running:
+                    return
+                self._trial_running = False
+                if failed:
+                    self._opened_at = now
+                else:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                return
+
+            # 차단 중이거나, 차단되기 전에 시작된 호출의 결과 -> 무시 (늦게 온 성공이 차단을 풀지 않게)
+            if self._opened_at is not None or generation != self._generation:
+                return
+
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls:
+                ratio = sum(self._outcomes) / len(self._outcomes)
+                if ratio >= self.failure_ratio:
+                    self._opened_at = now
+                    self._generation += 1
+                    print(f"⚠️ LLM 서킷 차단 (최근 실패율 {ratio:.0%}) -> {self.cooldown_sec:.0f}초 동안 대체 문구 사용")
+
+
+class LLMExecutor:
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, max_queue=LLM_MAX_QUEUE,
+                 call_timeout_sec=LLM_CALL_TIMEOUT_SEC, slow_call_sec=BREAKER_SLOW_CALL_SEC,
+                 breaker=None):
+        self.max_pending = max_in_flight + max_queue
+        self.call_timeout_sec = call_timeout_sec
+        self.slow_call_sec = slow_call_sec
+        self.breaker = breaker or CircuitBreaker()
+
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+        self._inflight = {}   # key -> Future (single-flight)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0, "rejected_busy": 0,
+                       "rejected_open": 0, "timeouts": 0, "errors": 0}
+
+    # -----------------------------
+    # 🔥 (1) 제출 (같은 키면 진행 중인 호출 공유)
+    # -----------------------------
+    def submit(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future
+
+            # 자리부터 확인 -> half-open 시험 티켓을 받아 놓고 거절해서 시험 호출이 영영 막히는 일이 없게
+            if len(self._inflight) >= self.max_pending:
+                self._stats["rejected_busy"] += 1
+                return self._failed(LLMUnavailable("too many pending LLM calls"))
+
+            ticket = self.breaker.allow()
+            if ticket is None:
+                self._stats["rejected_open"] += 1
+                return self._failed(LLMUnavailable("circuit open"))
+
+            self._stats["calls"] += 1
+            future = self._pool.submit(self._call, ticket, fn, args, kwargs)
+            self._inflight[key] = future
+
+        future.add_done_callback(lambda _: self._release(key, future))
+        return future
+
+    @staticmethod
+    def _failed(exc):
+        future = Future()
+        future.set_exception(exc)
+        return future
+
+    def _release(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _call(self, ticket, fn, args, kwargs):
+        started = time.monotonic()
+        try:
+            # 업스트림에도 마감 시간 전달 -> 느린 호출이 스레드를 붙잡지 않음
+            result = fn(*args, timeout=self.call_timeout_sec, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stats["errors"] += 1
+            self.breaker.record(ticket, failed=True)
+            raise
+
+        self.breaker.record(ticket, failed=time.monotonic() - started > self.slow_call_sec)
+        return result
+
+    # -----------------------------
+    # 🔥 (2) 제출 + 마감 시간까지 대기
+    # -----------------------------
+    def run(self, key, fn, *args, **kwargs):
+        future = self.submit(key, fn, *args, **kwargs)
+        try:
+            return future.result(timeout=self.call_timeout_sec)
+        except FutureTimeout:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise LLMUnavailable(f"LLM call exceeded {self.call_timeout_sec:.0f}s")
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._inflight), "breaker": self.breaker.state}
@@ -0,0 +1,43 @@
+import time
+from types import SimpleNamespace
+
+# ==========================================
+# OpenAI 클라이언트 대체용 로컬 스텁
+# - STYLE_TIP_STUB=1 로 실행하면 API 키 없이 전체 흐름 확인 가능
+# - client.chat.completions.create(...) 모양만 흉내냄
+# ==========================================
+STUB_TIP = """[얼굴형]
+(스텁) 얼굴형 고정 멘트
+
+[쉐딩]
+(스텁) 쉐딩 조언
+
+[하이라이터]
+(스텁) 하이라이터 조언
+
+[블러셔]
+(스텁) 블러셔 조언
+
+[색조 포인트]
+(스텁) 색조 조언"""
+
+
+class _StubCompletions:
+    def __init__(self, delay_sec, fail):
+        self.delay_sec = delay_sec
+        self.fail = fail
+        self.calls = 0
+
+    def create(self, model=None, messages=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay_sec)  # 실제 LLM 지연 흉내
+        if self.fail:
+            raise RuntimeError("stub LLM failure")
+
+        message = SimpleNamespace(role="assistant", content=STUB_TIP)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message)])
+
+
+class StubOpenAIClient:
+    def __init__(self, delay_sec=0.0, fail=False):
+        self.chat = SimpleNamespace(completions=_StubCompletions(delay_sec, fail))
@@ -0,0 +1,168 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+
+# ==========================================
+# 단계별 소요 시간 측정 (추천 엔진 + Flask 뷰)
+# - span 이름별 누적 히스토그램 -> /metrics (Prometheus 텍스트)
+# - 요청 하나 안에서 찍힌 span 목록 -> Server-Timing 헤더 / 느린 요청 로그
+# - 끄면 span() 은 아무것도 안 하는 객체 하나를 돌려줌 (시간 측정 / 잠금 없음)
+# ==========================================
+STAGE_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SLOW_REQUEST_MS = 500      # 이보다 오래 걸린 요청은 로그 + 최근 목록에 남김
+SLOW_LOG_SIZE = 100
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('_metrics', '_name', '_started')
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, (time.perf_counter() - self._started) * 1000)
+        return False
+
+
+class RequestTrace:
+    # 요청 하나 동안 찍힌 span (이름, ms) + 메모 (캐시 여부 / fallback 결과 등)
+    __slots__ = ('name', 'started', 'spans', 'notes')
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self.notes = {}
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        # 같은 이름이 여러 번 찍혔으면 합쳐서 (예: 한 요청 안의 여러 번 추천 호출)
+        merged = {}
+        for name, ms in self.spans:
+            merged[name] = merged.get(name, 0.0) + ms
+        parts = [f"{name};dur={ms:.2f}" for name, ms in merged.items()]
+        parts.append(f"total;dur={self.total_ms:.2f}")
+        return ", ".join(parts)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum_ms', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(STAGE_BUCKETS_MS) + 1)   # 마지막 칸 = +Inf
+        self.sum_ms = 0.0
+        self.count = 0
+
+
+class StageMetrics:
+    def __init__(self, enabled=True, slow_ms=SLOW_REQUEST_MS, slow_log_size=SLOW_LOG_SIZE):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.slow_requests = deque(maxlen=slow_log_size)
+        self._hist = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # -----------------------------
+    # 🔥 (1) 측정
+    # -----------------------------
+    def span(self, name):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, ms):
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.spans.append((name, ms))
+
+        with self._lock:
+            hist = self._hist.get(name)
+            if hist is None:
+                hist = self._hist[name] = _Histogram()
+            hist.counts[bisect_left(STAGE_BUCKETS_MS, ms)] += 1
+            hist.sum_ms += ms
+            hist.count += 1
+
+    def note(self, key, value):
+        # 현재 요청에 메모 남기기 (요청 밖 / 꺼져 있으면 무시)
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.notes[key] = value
+
+    # -----------------------------
+    # 🔥 (2) 요청 단위 묶음 (Flask before/after_request 에서 호출)
+    # -----------------------------
+    def begin(self, name):
+        if not self.enabled:
+            return None
+        trace = RequestTrace(name)
+        self._local.trace = trace
+        return trace
+
+    def end(self, params=None):
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return None
+        self._local.trace = None
+
+        total = trace.total_ms
+        self.observe(f"request.{trace.name}", total)
+        if total >= self.slow_ms:
+            entry = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "request": trace.name,
+                "total_ms": round(total, 2),
+                "params": params or {},
+                "notes": dict(trace.notes),
+                "spans": [(name, round(ms, 2)) for name, ms in trace.spans],
+            }
+            self.slow_requests.append(entry)
+            print(f"⚠️ 느린 요청 {trace.name} {total:.0f}ms | {entry['notes']} | params={entry['params']}")
+        return trace
+
+    # -----------------------------
+    # 🔥 (3) 내보내기
+    # -----------------------------
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {"count": h.count, "sum_ms": round(h.sum_ms, 3), "buckets": list(h.counts)}
+                for name, h in sorted(self._hist.items())
+            }
+
+    def render_prometheus(self):
+        lines = ["# HELP stage_duration_seconds Time spent per engine / view stage",
+                 "# TYPE stage_duration_seconds histogram"]
+        bounds = [f"{b / 1000:g}" for b in STAGE_BUCKETS_MS] + ["+Inf"]
+        for name, h in self.snapshot().items():
+            cumulative = 0
+            for le, n in zip(bounds, h["buckets"]):
+                cumulative += n
+                lines.append(f'stage_duration_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'stage_duration_seconds_sum{{stage="{name}"}} {h["sum_ms"] / 1000:.6f}')
+            lines.append(f'stage_duration_seconds_count{{stage="{name}"}} {h["count"]}')
+        return "\n".join(lines) + "\n"
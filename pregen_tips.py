@@ -0,0 +1,146 @@
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from recommender.core import MakeupRecommender, OCCASION_TAGS, BROAD_MOOD_MAPPER, INGEST_WORKERS
+from recommender.tip_cache import TipCache, TIP_STORE_PATH
+from recommender.style_tip import MOOD_DISPLAY, TONE_MAP, FACE_MAP
+from recommender.style_tip import make_llm_client, style_tip_cache_key, call_llm_style_tip
+
+
+# ==========================================
+# 스타일 팁 사전 생성 (얼굴형 × 톤 × 상황 × 무드 전체 조합)
+#   python pregen_tips.py --csv 최종_전처리완료_정리5.csv --concurrency 4
+#   (--csv 없이 실행하면 DB에서 로드, STYLE_TIP_STUB=1 이면 로컬 스텁)
+#
+# - 결과는 TIP_STORE_PATH 에 바로바로 저장 -> 중간에 끊겨도 다시 실행하면 이어서 진행
+# - 키 = 입력 + 1등 영상 제목/키워드 -> 카탈로그가 바뀌어도 1등 영상이 같은 칸은 건너뜀
+# ==========================================
+def enumerate_cells(engine):
+    # /result 의 기본 흐름 (A탭, 추가 태그 없음) 과 같은 입력
+    faces = sorted(set(FACE_MAP.values()))
+
+    # 1등 영상은 얼굴형과 무관 -> (톤, 상황, 무드) 조합만 한 번에 묶어서 추천
+    profiles = list(itertools.product(TONE_MAP, OCCASION_TAGS, BROAD_MOOD_MAPPER))
+    answers = engine.recommend_many([
+        dict(user_tone=tone, user_occasion_group=occasion, user_mood_group=mood, selected_tags=[], top_k=1)
+        for tone, occasion, mood in profiles
+    ])
+    top_by_profile = {
+        profile: answer["results"][0] if answer["results"] else None
+        for profile, answer in zip(profiles, answers)
+    }
+
+    for face, tone, occasion, mood in itertools.product(faces, TONE_MAP, OCCASION_TAGS, BROAD_MOOD_MAPPER):
+        top_video = top_by_profile[(tone, occasion, mood)]
+        if top_video is None:
+            continue
+
+        tip_args = dict(
+            user_face_shape=face,
+            user_tone=tone,
+            user_tpo=occasion,
+            user_mood=MOOD_DISPLAY.get(mood, ""),
+            video_title=top_video["title"],
+            video_keywords=top_video.get("moods", "")
+        )
+        yield style_tip_cache_key(**tip_args), tip_args
+
+
+class RetryBudget:
+    # 전체 작업이 함께 쓰는 재시도 횟수 (장애 시 무한 재시도 방지)
+    def __init__(self, total):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def generate_one(client, tip_args, max_attempts, budget, backoff_sec):
+    attempt = 1
+    while True:
+        try:
+            return call_llm_style_tip(client, **tip_args)
+        except Exception as e:
+            if attempt >= max_attempts or not budget.take():
+                raise
+            print(f"⚠️ LLM 재시도 ({attempt}/{max_attempts}): {e}")
+            time.sleep(backoff_sec * (2 ** (attempt - 1)))
+            attempt += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가능한 모든 프로필 조합의 스타일 팁을 미리 생성합니다.")
+    parser.add_argument("--csv", help="카탈로그 CSV 경로 (없으면 DB)")
+    parser.add_argument("--store", default=TIP_STORE_PATH, help="팁 저장소 (SQLite)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 보낼 LLM 요청 수")
+    parser.add_argument("--max-attempts", type=int, default=3, help="조합 하나당 최대 시도 횟수")
+    parser.add_argument("--retry-budget", type=int, default=50, help="전체 재시도 허용 횟수")
+    parser.add_argument("--backoff", type=float, default=1.0, help="첫 재시도 대기 시간(초), 이후 2배씩")
+    parser.add_argument("--prune", action="store_true", help="현재 조합에 없는 예전 팁 삭제")
+    args = parser.parse_args()
+
+    engine = MakeupRecommender(use_csv_for_test=bool(args.csv), csv_path=args.csv, recency_refresh_sec=None,
+                               ingest_workers=INGEST_WORKERS)
+    if engine.df.empty:
+        raise SystemExit("❌ 카탈로그가 비어 있어서 팁을 만들 수 없습니다.")
+
+    store = TipCache(args.store, ttl_sec=None, max_entries=None)
+
+    # -----------------------------
+    # 🔥 (1) 조합 나열 + 이미 있는 팁 건너뛰기
+    # -----------------------------
+    cells = dict(enumerate_cells(engine))   # 같은 키(같은 입력)는 한 번만
+    pending = {key: tip_args for key, tip_args in cells.items() if not store.contains(key)}
+    print(f"📂 조합 {len(cells)}개 중 새로 만들 팁 {len(pending)}개")
+
+    # -----------------------------
+    # 🔥 (2) 동시 요청 제한 + 재시도 예산
+    # -----------------------------
+    client = make_llm_client()
+    budget = RetryBudget(args.retry_budget)
+    done, failed = 0, 0
+
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        futures = {
+            pool.submit(generate_one, client, tip_args, args.max_attempts, budget, args.backoff): key
+            for key, tip_args in pending.items()
+        }
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    store.put(key, future.result())   # 한 칸씩 바로 저장 = 체크포인트
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ 생성 실패: {e}")
+
+                if (done + failed) % 50 == 0:
+                    print(f"⏳ 진행 {done + failed}/{len(pending)} (실패 {failed}, 남은 재시도 {budget.remaining})")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"⚠️ 중단됨 -> 다시 실행하면 이어서 진행 ({done}개 저장)")
+            raise SystemExit(1)
+
+    # -----------------------------
+    # 🔥 (3) 예전 카탈로그 기준 팁 정리
+    # -----------------------------
+    if args.prune:
+        removed = store.retain(cells.keys())
+        print(f"🧹 더 이상 쓰이지 않는 팁 {removed}개 삭제")
+
+    print(f"✅ 팁 사전 생성 완료: 새로 {done}개, 실패 {failed}개, 저장소 {store.stats()['entries']}개 -> {args.store}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+# ==========================================
+# 스타일 팁 백그라운드 작업
+# - /result 는 작업만 등록하고 바로 렌더링
+# - 페이지가 job id 로 결과를 따로 받아감 (짧게 기다렸다가 pending -> 페이지가 잠시 뒤 다시 조회)
+# - 실제 호출은 LLMExecutor 로 바로 제출 -> 동시 호출 수 / 대기열 제한 / 서킷 차단이 그대로 적용
+#   (대기열이 꽉 찼거나 차단 중이면 작업을 만들지 않고 None -> 호출 쪽이 바로 대체 문구 사용)
+# ==========================================
+STYLE_JOB_TTL_SEC = 5 * 60       # 결과를 받아가지 않은 작업 보관 시간
+STYLE_JOB_POLL_SEC = 1           # 한 번의 조회에서 최대 대기 시간 (길게 잡으면 조회 하나가 요청 워커를 붙잡음)
+
+
+class StyleTipJobs:
+    def __init__(self, executor, ttl_sec=STYLE_JOB_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._executor = executor
+        self._jobs = {}   # job_id -> (future, 실패 시 대체 문구, 등록 시각)
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # 🔥 (1) 작업 등록 -> job id (실행기가 받아주지 않으면 None)
+    # - 같은 job id 가 이미 진행 중이면 그 작업을 그대로 공유
+    # - on_success: 성공한 결과로 한 번 호출 (캐시 저장 등)
+    # -----------------------------
+    def submit(self, job_id, fn, *args, fallback=None, on_success=None, **kwargs):
+        with self._lock:
+            self._purge_expired()
+            if job_id in self._jobs:
+                return job_id
+
+            future = self._executor.submit(job_id, fn, *args, **kwargs)
+            if future.done() and future.exception() is not None:
+                print(f"⚠️ 스타일 팁 작업을 받지 못함 -> 대체 문구 사용: {future.exception()}")
+                return None
+            self._jobs[job_id] = (future, fallback, time.monotonic())
+
+        future.add_done_callback(lambda f: self._finished(f, on_success))
+        return job_id
+
+    @staticmethod
+    def _finished(future, on_success):
+        if future.exception() is not None:
+            print("LLM ERROR:", future.exception())
+        elif on_success is not None:
+            on_success(future.result())
+
+    def _purge_expired(self):
+        deadline = time.monotonic() - self.ttl_sec
+        for job_id in [j for j, (_, _, created) in self._jobs.items() if created < deadline]:
+            del self._jobs[job_id]
+
+    # -----------------------------
+    # 🔥 (2) 결과 조회
+    # - ("done", tip) / ("pending", None) / ("unknown", None)
+    # - 호출이 실패했으면 ("done", 대체 문구)
+    # -----------------------------
+    def poll(self, job_id, wait_sec=STYLE_JOB_POLL_SEC):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        if entry is None:
+            return "unknown", None
+
+        # 완료된 작업도 TTL 동안은 남겨둠 (같은 결과를 여러 탭이 받아갈 수 있음)
+        future, fallback = entry[0], entry[1]
+        try:
+            return "done", future.result(timeout=wait_sec)
+        except FutureTimeout:
+            return "pending", None
+        except Exception:
+            return "done", fallback
+
+    def __len__(self):
+        with self._lock:
+            return len(self._jobs)
@@ -0,0 +1,198 @@
+import os
+
+from recommender.tip_cache import tip_cache_key
+
+# ==========================================
+# LLM 스타일 팁 (프롬프트 + 호출)
+# - app.py (/result) 와 pregen_tips.py (배치) 가 같이 사용
+# ==========================================
+STYLE_TIP_MODEL = "gpt-4.1-mini"
+STYLE_TIP_PROMPT_VERSION = "v1"  # ⚠️ 프롬프트 수정 시 올릴 것 (예전 캐시 무효화)
+
+# 화면/프롬프트에 쓰는 이름들
+MOOD_DISPLAY = {
+    "group_natural": "내추럴 / 청순",
+    "group_lovely": "러블리",
+    "group_glam": "글램 / 고급",
+    "group_chic": "시크 / 스모키 / 고혹",
+    "group_hip": "힙·트렌디 / 유니크"
+}
+
+TONE_MAP = {
+    "봄웜": "spring",
+    "여쿨": "summer",
+    "가을웜": "autumn",
+    "겨쿨": "winter",
+
+    "웜톤": "spring",  # 퀴즈에서 선택한 경우
+    "쿨톤": "summer",
+
+    "뉴트럴": "neutral",
+    "neutral": "neutral"
+}
+
+FACE_MAP = {
+    "계란형": "oval",
+    "oval": "oval",
+
+    "둥근형": "round",
+    "round": "round",
+
+    "땅콩형": "diamond",
+    "diamond": "diamond",
+
+    "각진형": "square",
+    "square": "square",
+
+    "하트형": "heart",
+    "heart": "heart",
+
+    "긴형": "long",
+    "long": "long"
+}
+
+SYSTEM_INSTRUCTION = """
+당신은 청담동에서 10년 이상 활동한 ‘퍼스널 메이크업 전문 컨설턴트’입니다.
+당신의 임무는 사용자의 [얼굴형, 퍼스널컬러, 상황, 분위기] 정보를 바탕으로,
+추천된 메이크업 영상의 기법을 ‘사용자에게 맞게 변형’하여 실전 조언을 해주는 것입니다.
+
+[말하기 규칙]
+1. 20대 여성 친구에게 말하듯 다정하고 신뢰감 있는 말투(“~해요”, “~네요”)를 사용하세요.
+2. 영상 내용을 단순 요약하지 말고, 반드시 ‘사용자의 얼굴형·톤’과 연결해 조언하세요.
+
+────────────────────────
+[얼굴형 고정 멘트 – 수정 금지]
+
+땅콩형
+광대뼈가 매력적으로 도드라지고 턱선이 날렵한 얼굴형입니다. 얼굴의 굴곡을 부드럽게 연결해 세련된 인상을 줄 수 있어요.
+쉐딩: 옆 광대의 돌출된 부분과 턱 끝 라인을 감싸 전체적인 얼굴 라인을 매끄럽게 연결
+하이라이터: 눈 밑 앞볼 부위(삼각형 존)와 턱 끝에 사용하여 시선을 얼굴 중앙으로 모아줌
+블러셔: 광대 감싸듯 연결
+
+긴형
+성숙하고 우아한 이미지를 가진 얼굴형입니다. 시선을 가로로 확장시켜 생기와 볼륨을 더해주는 방식이 잘 어울려요.
+쉐딩: 턱 끝 아래
+하이라이터: 눈 밑을 터치하여 얼굴의 중안부를 환하게 밝혀줌 
+블러셔: 가로 방향(수평)으로 넓게 펴 발라주어 여백을 채워줌
+
+각진형
+하관과 턱선이 뚜렷해 고급스럽고 모던한 분위기를 주는 얼굴형입니다. 직선적인 느낌을 중화시키면 부드러운 인상이 살아나요.
+쉐딩: 턱 양 끝, 헤어라인 옆쪽 등 윤곽이 뚜렷한 부위에 음영을 줌
+하이라이터: 콧대, 턱 중앙 등 얼굴 안쪽에 포인트를 주어 입체감을 살림 
+블러셔: 사선 또는 앞볼에 동그랗게 연출
+
+계란형(oval)
+전체적인 비율이 균형 잡혀 있어 다양한 스타일을 소화하기 좋은 얼굴형입니다. 인위적인 터치보다는 윤곽을 자연스럽게 살리는 게 좋아요.
+쉐딩: 외곽 정돈
+하이라이터: 콧대, 턱 끝, C존(광대)
+블러셔: 광대 따라 자연스럽게
+
+둥근형
+부드러운 곡선 덕분에 어려 보이고 친근한 인상을 주는 얼굴형입니다. 윤곽을 또렷하게 잡아주면 훨씬 세련된 분위기가 살아나요.
+쉐딩: 얼굴 양옆 외곽~턱선
+하이라이터: 이마, 콧대, 턱 세로 강조
+블러셔: 사선 방향으로 연출하여 둥근 볼의 매력은 살리면서도 시원한 느낌을 줌 
+
+하트형(heart)
+이마가 시원하고 턱선이 갸름해 러블리한 느낌을 주는 얼굴형입니다. 상안부와 하안부의 밸런스를 맞추는 메이크업이 잘 어울려요.
+쉐딩: 관자, 턱 끝
+하이라이터: 이마 중앙, 턱 중앙, 눈 밑
+블러셔: 볼 중앙 위주로 발라주면 갸름한 턱선과 대비되어 화사한 느낌을 줌 
+
+────────────────────────
+
+[출력 형식 – 반드시 이 형식으로만 출력할 것]
+
+문단 합치기, 한 줄 출력, 자유 서술은 허용하지 않습니다.
+
+[얼굴형]
+(얼굴형 고정 멘트 그대로)
+
+[쉐딩]
+(쉐딩 조언 1문장)
+
+[하이라이터]
+(하이라이터 조언 1문장)
+
+[블러셔]
+(블러셔 조언 1문장)
+
+[색조 포인트]
+(퍼스널컬러 기준 + Top-N 영상 스타일을 모두 조합한 색조 조언 3문장)
+
+**주의:** 각 항목은 반드시 줄을 바꿔서 한 항목당 한 줄로 출력해야 하며,  
+각 항목 앞에는 반드시 '\n' 줄바꿈 문자를 포함하여 출력하세요.
+"""
+
+
+def make_llm_client():
+    # STYLE_TIP_STUB=1 -> API 키 없이 로컬 스텁으로 동작 (개발/테스트용)
+    if os.getenv("STYLE_TIP_STUB") == "1":
+        from recommender.llm_stub import StubOpenAIClient
+        print("⚠️ 스타일 팁: 로컬 스텁 클라이언트 사용")
+        return StubOpenAIClient(delay_sec=float(os.getenv("STYLE_TIP_STUB_DELAY", "0")))
+
+    from openai import OpenAI
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다!")
+
+    return OpenAI(api_key=api_key)
+
+
+def style_tip_cache_key(
+    user_face_shape,
+    user_tone,
+    user_tpo,
+    user_mood,
+    video_title,
+    video_keywords
+):
+    # 같은 입력 + 같은 프롬프트 버전이면 같은 키
+    return tip_cache_key(
+        STYLE_TIP_PROMPT_VERSION, STYLE_TIP_MODEL,
+        user_face_shape, user_tone, user_tpo, user_mood, video_title, video_keywords
+    )
+
+
+def call_llm_style_tip(
+    client,
+    user_face_shape,
+    user_tone,
+    user_tpo,
+    user_mood,
+    video_title,
+    video_keywords,
+    timeout=None
+):
+    # 실패하면 예외 그대로 올림 (재시도/대체 문구는 호출하는 쪽에서)
+    user_input_data = f"""
+[사용자 프로필]
+- 얼굴형: {user_face_shape} (예: 둥근형, 긴형, 각진형...)
+- 퍼스널컬러: {user_tone} (예: 봄웜, 여쿨, 겨울쿨...)
+
+[원한 상황]
+- TPO: {user_tpo} (예: 데이트, 출근...)
+- 분위기: {user_mood} (예: 러블리, 시크...)
+
+[추천 영상]
+- 제목: {video_title}
+- 키워드: {video_keywords}
+"""
+
+    response = client.chat.completions.create(
+        model=STYLE_TIP_MODEL,
+        temperature=0.7,
+        timeout=timeout,  # None -> 클라이언트 기본값
+        messages=[
+            {"role": "system", "content": SYSTEM_INSTRUCTION},
+            {"role": "user", "content": user_input_data}
+        ]
+    )
+
+    return response.choices[0].message.content.strip()
+
+
+def fallback_style_tip(user_tpo, user_mood, user_tone, **_):
+    return f"오늘 같은 {user_tpo} 날에는 {user_mood} 분위기가 딱이에요! {user_tone} 톤에 맞춰 립 컬러만 살짝 조절해 보세요."
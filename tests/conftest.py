@@ -0,0 +1,16 @@
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# 저장소 폴더 자체가 recommender 패키지 (from recommender.core import ...)
+# -> 폴더 이름과 상관없이 테스트에서도 같은 이름으로 import 되게 등록
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "recommender" not in sys.modules:
+    spec = importlib.machinery.ModuleSpec("recommender", None, is_package=True)
+    spec.submodule_search_locations = [ROOT]
+    sys.modules["recommender"] = importlib.util.module_from_spec(spec)
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)   # app.py 는 최상위 모듈 app 으로 import
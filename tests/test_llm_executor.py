@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from recommender.llm_executor import LLMExecutor, CircuitBreaker, LLMUnavailable
+
+
+def blocking_call(release, timeout=None):
+    release.wait(timeout)
+    return "늦은 결과"
+
+
+def ok_call(timeout=None):
+    return "결과"
+
+
+# -----------------------------
+# 🔥 (1) half-open 중 대기열 초과로 거절 -> 시험 호출 기회는 그대로 남아 있어야 함
+# -----------------------------
+def test_busy_rejection_while_half_open_keeps_trial():
+    breaker = CircuitBreaker(min_calls=1, cooldown_sec=0.05)
+    executor = LLMExecutor(max_in_flight=1, max_queue=0, breaker=breaker)
+
+    release = threading.Event()
+    running = executor.submit("slow", blocking_call, release)
+
+    # 실패 한 번으로 차단 -> 쿨다운이 지나면 half-open
+    breaker.record(breaker.allow(), failed=True)
+    time.sleep(0.1)
+    assert breaker.state == "half_open"
+
+    with pytest.raises(LLMUnavailable, match="too many pending"):
+        executor.submit("busy", ok_call).result()
+
+    release.set()
+    running.result(timeout=1)
+    deadline = time.monotonic() + 1
+    while executor.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # 시험 호출이 통과 -> 서킷이 다시 닫힘
+    assert executor.submit("trial", ok_call).result(timeout=1) == "결과"
+    assert breaker.state == "closed"
@@ -0,0 +1,198 @@
+import importlib
+import os
+import re
+import time
+
+import pytest
+
+from recommender.core import MakeupRecommender
+from recommender.llm_executor import LLMExecutor
+from recommender.llm_stub import StubOpenAIClient, STUB_TIP
+from recommender.pregen_tips import enumerate_cells, generate_one, RetryBudget
+from recommender.style_jobs import StyleTipJobs
+from recommender.style_tip import MOOD_DISPLAY, style_tip_cache_key, fallback_style_tip
+from recommender.tip_cache import TipCache
+
+from conftest import ROOT
+
+CATALOG_CSV = os.path.join(ROOT, "최종_전처리완료_정리5.csv")
+
+# UI 가 실제로 보내는 값 (톤 = TONE_MAP 키, 얼굴형 = 영문 값, 무드 = 그룹 키)
+FORM = dict(tone="여쿨", occasion="데일리", moods="group_natural", face_shape="oval", tab_mode="A")
+
+
+# ==========================================
+# app 모듈 (로컬 스텁 LLM + 임시 경로) + 저장소 CSV 로 만든 엔진
+# ==========================================
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("app")
+    env = {
+        "STYLE_TIP_STUB": "1",
+        "STYLE_TIP_CACHE_PATH": str(tmp / "tip_cache.db"),
+        "STYLE_TIP_STORE_PATH": str(tmp / "tip_store.db"),
+        "CATALOG_SNAPSHOT_PATH": str(tmp / "snapshot"),
+        "FACET_LATTICE_PATH": str(tmp / "facets.npz"),
+        "REC_TABLE_PATH": str(tmp / "rec_table"),
+    }
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    try:
+        module = importlib.import_module("app")
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    # app.py 의 CSV 경로는 개발 PC 기준 -> 저장소 CSV 로 만든 엔진으로 교체
+    module.engine = MakeupRecommender(use_csv_for_test=True, csv_path=CATALOG_CSV, recency_refresh_sec=None)
+    return module
+
+
+@pytest.fixture
+def app_env(app_module, tmp_path, monkeypatch):
+    # 테스트마다 빈 캐시 + 새 실행기 / 작업 목록 + 스텁 클라이언트
+    executor = LLMExecutor(max_in_flight=2, max_queue=2)
+    monkeypatch.setattr(app_module, "client", StubOpenAIClient())
+    monkeypatch.setattr(app_module, "llm_executor", executor)
+    monkeypatch.setattr(app_module, "style_jobs", StyleTipJobs(executor))
+    monkeypatch.setattr(app_module, "tip_cache", TipCache(str(tmp_path / "cache.db")))
+    monkeypatch.setattr(app_module, "tip_store", TipCache(str(tmp_path / "store.db"), ttl_sec=None, max_entries=None))
+    return app_module
+
+
+def post_result(app_env):
+    html = app_env.app.test_client().post("/result", data=FORM).get_data(as_text=True)
+    job = re.search(r'data-job="([^"]*)"', html)
+    return html, job.group(1) if job else None
+
+
+def stub_calls(app_env):
+    return app_env.client.chat.completions.calls
+
+
+def top_tip_args(app_env):
+    # /result 가 1등 영상으로 만드는 팁 입력과 같은 값
+    top = app_env.engine.recommend(
+        user_tone=FORM["tone"], user_occasion_group=FORM["occasion"], user_mood_group=FORM["moods"],
+        selected_tags=[], ignore_tone=False, top_k=5
+    )["results"][0]
+    return dict(
+        user_face_shape=FORM["face_shape"], user_tone=FORM["tone"], user_tpo=FORM["occasion"],
+        user_mood=MOOD_DISPLAY.get(FORM["moods"], ""), video_title=top["title"],
+        video_keywords=top.get("moods", "")
+    )
+
+
+# -----------------------------
+# 🔥 (1) 저장된 팁 -> 페이지에 바로 (작업 / LLM 호출 없음)
+# -----------------------------
+def test_cached_tip_rendered_inline(app_env):
+    app_env.tip_store.put(style_tip_cache_key(**top_tip_args(app_env)), "미리 만든 스타일 팁")
+
+    html, job = post_result(app_env)
+
+    assert "미리 만든 스타일 팁" in html
+    assert job == ""
+    assert stub_calls(app_env) == 0
+
+
+# -----------------------------
+# 🔥 (1-1) pregen_tips.py 가 미리 만든 팁 -> 같은 키로 찾아서 바로 표시 (LLM 호출 없음)
+# -----------------------------
+def test_pregen_tip_hit(app_env):
+    form_cell = dict(user_face_shape=FORM["face_shape"], user_tone=FORM["tone"], user_tpo=FORM["occasion"],
+                     user_mood=MOOD_DISPLAY[FORM["moods"]])
+    cells = [(key, tip_args) for key, tip_args in enumerate_cells(app_env.engine)
+             if all(tip_args[k] == v for k, v in form_cell.items())]
+    assert len(cells) == 1
+
+    key, tip_args = cells[0]
+    pregen_client = StubOpenAIClient()
+    app_env.tip_store.put(key, generate_one(pregen_client, tip_args, max_attempts=1, budget=RetryBudget(0),
+                                            backoff_sec=0))
+
+    html, job = post_result(app_env)
+
+    assert STUB_TIP.splitlines()[0] in html
+    assert job == ""
+    assert pregen_client.chat.completions.calls == 1
+    assert stub_calls(app_env) == 0
+
+
+# -----------------------------
+# 🔥 (2) 작업 등록 -> 조회 -> 완료 (결과는 공유 캐시에도 저장)
+# -----------------------------
+def test_job_submit_poll_done(app_env):
+    html, job = post_result(app_env)
+    assert job
+
+    resp = app_env.app.test_client().get(f"/api/style-tip/{job}")
+    assert resp.status_code == 200
+    assert resp.json == {"status": "done", "tip": STUB_TIP}
+    assert stub_calls(app_env) == 1
+
+    # 저장은 완료 콜백에서 -> 조회 응답보다 조금 늦을 수 있음
+    deadline = time.monotonic() + 2
+    while app_env.tip_cache.get(job) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app_env.tip_cache.get(job) == STUB_TIP
+
+    # 같은 입력으로 다시 오면 저장된 팁을 바로 표시
+    html, job = post_result(app_env)
+    assert job == ""
+    assert stub_calls(app_env) == 1
+
+
+# -----------------------------
+# 🔥 (3) LLM 실패 -> 대체 문구 (캐시에는 저장하지 않음)
+# -----------------------------
+def test_llm_failure_falls_back(app_env, monkeypatch):
+    monkeypatch.setattr(app_env, "client", StubOpenAIClient(fail=True))
+
+    html, job = post_result(app_env)
+    assert job
+
+    resp = app_env.app.test_client().get(f"/api/style-tip/{job}")
+    assert resp.status_code == 200
+    assert resp.json == {"status": "done", "tip": fallback_style_tip(**top_tip_args(app_env))}
+    assert app_env.tip_cache.get(job) is None
+
+
+# -----------------------------
+# 🔥 (4) 느린 LLM -> 조회는 짧게 기다리고 202 + Retry-After, 다시 조회하면 done
+# -----------------------------
+def test_slow_job_returns_pending_quickly(app_env, monkeypatch):
+    monkeypatch.setattr(app_env, "client", StubOpenAIClient(delay_sec=1.5))
+    client = app_env.app.test_client()
+
+    html, job = post_result(app_env)
+    started = time.monotonic()
+    resp = client.get(f"/api/style-tip/{job}")
+    assert time.monotonic() - started < 1.4
+    assert resp.status_code == 202
+    assert resp.headers["Retry-After"] == str(app_env.STYLE_TIP_RETRY_SEC)
+
+    deadline = time.monotonic() + 5
+    while resp.status_code == 202 and time.monotonic() < deadline:
+        resp = client.get(f"/api/style-tip/{job}")
+    assert resp.json == {"status": "done", "tip": STUB_TIP}
+
+
+# -----------------------------
+# 🔥 (5) 이 프로세스에 없는 작업 -> 바로 pending (다른 워커가 공유 캐시에 저장하면 done)
+# -----------------------------
+def test_unknown_job(app_env):
+    client = app_env.app.test_client()
+
+    resp = client.get("/api/style-tip/no-such-job")
+    assert resp.status_code == 202
+    assert resp.headers["Retry-After"] == str(app_env.STYLE_TIP_RETRY_SEC)
+    assert resp.json == {"status": "pending", "tip": ""}
+
+    app_env.tip_cache.put("no-such-job", "다른 워커가 만든 팁")
+    resp = client.get("/api/style-tip/no-such-job")
+    assert resp.status_code == 200
+    assert resp.json == {"status": "done", "tip": "다른 워커가 만든 팁"}
@@ -0,0 +1,223 @@
+import sqlite3
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# ==========================================
+# LLM 스타일 팁 영구 캐시 (SQLite)
+# - 재시작해도 유지, 여러 워커 프로세스가 같은 파일 공유
+# - TTL + 최대 개수 기준으로 오래된 항목 정리
+# - 적중/미스 카운터도 DB에 저장 (프로세스 합산)
+#   -> 조회는 읽기만, 적중 기록은 프로세스 메모리에 모았다가 한 번에 반영 (조회마다 쓰기 트랜잭션 X)
+# ==========================================
+TIP_CACHE_PATH = "style_tip_cache.sqlite3"
+TIP_STORE_PATH = "style_tip_store.sqlite3"   # pregen_tips.py 가 채우는 사전 생성 팁 (만료 없음)
+TIP_CACHE_TTL_SEC = 30 * 24 * 60 * 60   # 30일
+TIP_CACHE_MAX_ENTRIES = 20000
+TIP_CACHE_FLUSH_EVENTS = 200   # 모아둔 적중/미스가 이만큼 쌓이면 DB 반영
+TIP_CACHE_FLUSH_SEC = 30       # 또는 마지막 반영 후 이만큼 지나면 반영
+
+
+def tip_cache_key(prompt_version, *inputs):
+    # 프롬프트 버전이 바뀌면 키도 바뀜 -> 예전 팁은 자연스럽게 만료
+    raw = json.dumps([prompt_version, *[str(v) for v in inputs]], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TipCache:
+    def __init__(self, path=TIP_CACHE_PATH, ttl_sec=TIP_CACHE_TTL_SEC, max_entries=TIP_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_sec = ttl_sec          # None -> 만료 없음
+        self.max_entries = max_entries  # None -> 개수 제한 없음
+
+        # 아직 DB 에 반영하지 않은 적중 기록 (프로세스가 죽으면 마지막 묶음만 빠짐 -> 통계 / LRU 용이라 괜찮음)
+        self._pending_hits = {}   # key -> [적중 횟수, 마지막 적중 시각]
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._flushed_at = time.monotonic()
+        self._pending_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 읽기/쓰기 동시 진행 (멀티 프로세스)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tips (
+                    key TEXT PRIMARY KEY,
+                    tip TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_hit_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tips_last_hit ON tips(last_hit_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # 요청마다 짧게 열고 닫음 (스레드/프로세스 간 커넥션 공유 X)
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # 정상 종료 시 commit, 예외 시 rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def _min_created(self, now):
+        return now - self.ttl_sec if self.ttl_sec is not None else 0
+
+    @staticmethod
+    def _bump(conn, name, n=1):
+        conn.execute(
+            "INSERT INTO counters(name, value) VALUES(?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n)
+        )
+
+    # -----------------------------
+    # 🔥 (1) 조회 (읽기만, 적중 기록은 모아서 나중에 반영)
+    # -----------------------------
+    def get(self, key):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT tip FROM tips WHERE key = ? AND created_at >= ?",
+                    (key, self._min_created(now))
+                ).fetchone()
+        except sqlite3.Error as e:
+            # 캐시 문제로 페이지가 죽으면 안 됨 -> 미스로 취급
+            print(f"⚠️ 스타일 팁 캐시 조회 실패: {e}")
+            return None
+
+        self._record(key if row is not None else None, now)
+        return row[0] if row is not None else None
+
+    def _record(self, key, now):
+        with self._pending_lock:
+            if key is None:
+                self._pending_counts["misses"] += 1
+            else:
+                self._pending_counts["hits"] += 1
+                entry = self._pending_hits.setdefault(key, [0, now])
+                entry[0] += 1
+                entry[1] = now
+            due = (sum(self._pending_counts.values()) >= TIP_CACHE_FLUSH_EVENTS or
+                   time.monotonic() - self._flushed_at >= TIP_CACHE_FLUSH_SEC)
+        if due:
+            self.flush()
+
+    def _take_pending(self):
+        with self._pending_lock:
+            hits, counts = self._pending_hits, self._pending_counts
+            self._pending_hits, self._pending_counts = {}, {"hits": 0, "misses": 0}
+            self._flushed_at = time.monotonic()
+        return hits, counts
+
+    def _apply_pending(self, conn, hits, counts):
+        conn.executemany(
+            "UPDATE tips SET hits = hits + ?, last_hit_at = MAX(last_hit_at, ?) WHERE key = ?",
+            [(n, last_hit, key) for key, (n, last_hit) in hits.items()]
+        )
+        for name, n in counts.items():
+            if n:
+                self._bump(conn, name, n)
+
+    def flush(self):
+        # 모아둔 적중 기록을 한 트랜잭션으로 반영 (실패하면 이번 묶음은 버림)
+        hits, counts = self._take_pending()
+        if not hits and not any(counts.values()):
+            return
+        try:
+            with self._connect() as conn:
+                self._apply_pending(conn, hits, counts)
+        except sqlite3.Error as e:
+            print(f"⚠️ 스타일 팁 캐시 적중 기록 반영 실패: {e}")
+
+    # -----------------------------
+    # 🔥 (2) 저장 + 정리
+    # -----------------------------
+    def put(self, key, tip):
+        now = time.time()
+        hits, counts = self._take_pending()
+        try:
+            with self._connect() as conn:
+                # 어차피 쓰기 트랜잭션 -> 모아둔 적중 기록도 같이 반영 (LRU 정리 전에)
+                self._apply_pending(conn, hits, counts)
+                conn.execute(
+                    "INSERT OR REPLACE INTO tips(key, tip, created_at, last_hit_at, hits) VALUES(?, ?, ?, ?, 0)",
+                    (key, tip, now, now)
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"⚠️ 스타일 팁 캐시 저장 실패: {e}")
+
+    def _evict(self, conn, now):
+        # 1) TTL 지난 항목
+        removed = conn.execute(
+            "DELETE FROM tips WHERE created_at < ?", (self._min_created(now),)
+        ).rowcount
+
+        # 2) 개수 초과분 -> 가장 오래 안 쓰인 것부터
+        overflow = 0
+        if self.max_entries is not None:
+            overflow = conn.execute("SELECT COUNT(*) FROM tips").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            removed += conn.execute(
+                "DELETE FROM tips WHERE key IN "
+                "(SELECT key FROM tips ORDER BY last_hit_at ASC LIMIT ?)",
+                (overflow,)
+            ).rowcount
+
+        if removed:
+            self._bump(conn, "evictions", removed)
+
+    def contains(self, key):
+        # 카운터를 건드리지 않는 존재 확인 (배치 작업 재개용)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM tips WHERE key = ? AND created_at >= ?",
+                (key, self._min_created(time.time()))
+            ).fetchone()
+        return row is not None
+
+    def retain(self, keys):
+        # keys 에 없는 항목 전부 삭제 -> 삭제 개수
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE keep(key TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO keep(key) VALUES(?)", [(k,) for k in keys])
+            removed = conn.execute("DELETE FROM tips WHERE key NOT IN (SELECT key FROM keep)").rowcount
+            conn.execute("DROP TABLE keep")
+        return removed
+
+    def clear(self):
+        self._take_pending()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tips")
+            conn.execute("DELETE FROM counters")
+
+    # -----------------------------
+    # 🔥 (3) 통계 (전체 프로세스 합산)
+    # -----------------------------
+    def stats(self):
+        self.flush()
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM tips").fetchone()[0]
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        total = hits + misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_sec": self.ttl_sec,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }